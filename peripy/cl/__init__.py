@@ -1,5 +1,6 @@
 """OpenCL peridynamics implementation."""
-from .utilities import double_fp_support, get_context, output_device_info
+from .utilities import (double_fp_support, get_context, output_device_info,
+                        pinned_empty, pinned_release)
 import pathlib
 
 kernel_source_files = [
@@ -16,4 +17,4 @@ kernel_source = "".join(
     )
 
 __all__ = ["kernel_source", "double_fp_support", "get_context",
-           "output_device_info"]
+           "output_device_info", "pinned_empty", "pinned_release"]
@@ -1,5 +1,9 @@
 #pragma OPENCL EXTENSION cl_khr_fp64 : enable
 
+// NDOF, the total number of degrees of freedom, may be defined at build time
+// so that the kernel can be enqueued with a global size padded to a multiple
+// of an explicit work-group size
+
 __kernel void
 	update_displacement(
     	__global double const* force,
@@ -20,5 +24,12 @@ __kernel void
      * dt - The time step in [s]. */
 	const int i = get_global_id(0);
 
+#ifdef NDOF
+    // The global size is padded to a multiple of the work-group size
+    if (i >= NDOF) {
+        return;
+    }
+#endif
+
 	u[i] = (bc_types[i] == 0 ? (u[i] + dt * force[i]) : (bc_scale * bc_values[i]));
 }
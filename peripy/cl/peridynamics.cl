@@ -1,12 +1,56 @@
 #pragma OPENCL EXTENSION cl_khr_fp64 : enable
 
-
-__kernel void
+/* Memory layout of the bond arrays.
+ *
+ * The bond_force and damage kernels are launched with one work-group per node
+ * and one work-item per neighbour, so that global_id = i * max_neigh + k.
+ * nlist and the other (n, local_size) bond arrays are stored row-major, so the
+ * work-items of a work-group read consecutive elements and the loads are
+ * coalesced. A transposed (local_size, n) layout would scatter these loads
+ * across n elements and must not be used with this launch configuration. */
+
+/* Floating-point precision of the bond geometry.
+ *
+ * The deformed bond vectors are formed from the double precision coordinates
+ * and displacements, after which the deformed bond lengths, stretch and bond
+ * direction are evaluated in REAL precision. The initial bond lengths are
+ * precomputed on the host and stored in REAL precision. Bond forces are always
+ * accumulated in double precision. REAL may be overridden at build time with
+ * -DREAL=float.
+ *
+ * Reading the initial bond length is one coalesced REAL load per bond, which
+ * is small next to the scattered 48 byte gather of r0[j] and u[j]. It replaces
+ * a dot product and a square root, which are slow in double precision on
+ * devices with reduced double precision throughput. */
+#ifndef REAL
+#define REAL double
+#endif
+#define CAT(a, b) a ## b
+#define XCAT(a, b) CAT(a, b)
+#define REAL3 XCAT(REAL, 3)
+#define convert_real3 XCAT(convert_, REAL3)
+
+/* Work-group size of the bond_force and damage kernels.
+ *
+ * When MAX_NEIGHBOURS is defined at build time the work-group size is a
+ * compile time constant, so the parallel reductions can be unrolled and the
+ * kernels are specialised with reqd_work_group_size. Otherwise the work-group
+ * size is read at run time. */
+#ifdef MAX_NEIGHBOURS
+#define BOND_WORK_GROUP __attribute__((reqd_work_group_size(MAX_NEIGHBOURS, 1, 1)))
+#define BOND_LOCAL_SIZE MAX_NEIGHBOURS
+#else
+#define BOND_WORK_GROUP
+#define BOND_LOCAL_SIZE get_local_size(0)
+#endif
+
+__kernel BOND_WORK_GROUP void
 	bond_force1(
     __global double const* u,
     __global double* force,
     __global double* body_force,
     __global double const* r0,
+    __global REAL const* bond_lengths,
     __global double const* vols,
 	__global int* nlist,
     __global int const* fc_types,
@@ -31,6 +75,7 @@ __kernel void
      * force - An (n,3) array of the current forces on the particles.
      * body_force - An (n,3) array of the current internal body forces of the particles.
      * r0 - An (n,3) array of the coordinates of the nodes in the initial state.
+     * bond_lengths - An (n, local_size) array of the lengths of the bonds in the initial state, in REAL precision.
      * vols - the volumes of each of the nodes.
      * nlist - An (n, local_size) array containing the neighbour lists,
      *     a value of -1 corresponds to a broken bond.
@@ -53,7 +98,7 @@ __kernel void
     // local_id is the LOCAL node id in range [0, max_neigh] of a node in this parent node's family
 	const int local_id = get_local_id(0);
     // local_size is the max_neigh, usually 128 or 256 depending on the problem
-    const int local_size = get_local_size(0);
+    const int local_size = BOND_LOCAL_SIZE;
 	// group_id is the node i
 	const int node_id_i = get_group_id(0);
 
@@ -62,29 +107,25 @@ __kernel void
 
 	// If bond is not broken
 	if (node_id_j != -1) {
-		const double xi_x = r0[3 * node_id_j + 0] - r0[3 * node_id_i + 0];
-		const double xi_y = r0[3 * node_id_j + 1] - r0[3 * node_id_i + 1];
-		const double xi_z = r0[3 * node_id_j + 2] - r0[3 * node_id_i + 2];
+		// Vector loads of the (n,3) coordinate and displacement arrays
+		const double3 xi_vec_d = vload3(node_id_j, r0) - vload3(node_id_i, r0);
+		const double3 xi_eta_d = vload3(node_id_j, u) - vload3(node_id_i, u) + xi_vec_d;
 
-		const double xi_eta_x = u[3 * node_id_j + 0] - u[3 * node_id_i + 0] + xi_x;
-		const double xi_eta_y = u[3 * node_id_j + 1] - u[3 * node_id_i + 1] + xi_y;
-		const double xi_eta_z = u[3 * node_id_j + 2] - u[3 * node_id_i + 2] + xi_z;
+		const REAL3 xi_eta = convert_real3(xi_eta_d);
 
-		const double xi = sqrt(xi_x * xi_x + xi_y * xi_y + xi_z * xi_z);
-		const double y = sqrt(xi_eta_x * xi_eta_x + xi_eta_y * xi_eta_y + xi_eta_z * xi_eta_z);
-		const double s = (y -  xi)/ xi;
+		const REAL xi = bond_lengths[global_id];
+		const REAL y = sqrt(dot(xi_eta, xi_eta));
+		const REAL s = (y -  xi)/ xi;
 
         // Check for state of bonds here, and break it if necessary
 		if (s < critical_stretch) {
-            const double cx = xi_eta_x / y;
-		    const double cy = xi_eta_y / y;
-		    const double cz = xi_eta_z / y;
+            const REAL3 c = xi_eta / y;
 
 		    const double f = s * bond_stiffness * vols[node_id_j];
             // Copy bond forces into local memory
-		    local_cache_x[local_id] = f * cx;
-		    local_cache_y[local_id] = f * cy;
-		    local_cache_z[local_id] = f * cz;
+		    local_cache_x[local_id] = f * c.x;
+		    local_cache_y[local_id] = f * c.y;
+		    local_cache_z[local_id] = f * c.z;
 		}
         else {
             // bond is broken
@@ -131,12 +172,13 @@ __kernel void
 }
 
 
-__kernel void
+__kernel BOND_WORK_GROUP void
 	bond_force2(
     __global double const* u,
     __global double* force,
     __global double* body_force,
     __global double const* r0,
+    __global REAL const* bond_lengths,
     __global double const* vols,
 	__global int* nlist,
     __global int const* fc_types,
@@ -161,6 +203,7 @@ __kernel void
      * force - An (n,3) array of the current forces on the particles.
      * body_force - An (n,3) array of the current internal body forces of the particles.
      * r0 - An (n,3) array of the coordinates of the nodes in the initial state.
+     * bond_lengths - An (n, local_size) array of the lengths of the bonds in the initial state, in REAL precision.
      * vols - the volumes of each of the nodes.
      * nlist - An (n, local_size) array containing the neighbour lists,
      *     a value of -1 corresponds to a broken bond.
@@ -184,7 +227,7 @@ __kernel void
     // local_id is the LOCAL node id in range [0, max_neigh] of a node in this parent node's family
 	const int local_id = get_local_id(0);
     // local_size is the max_neigh, usually 128 or 256 depending on the problem
-    const int local_size = get_local_size(0);
+    const int local_size = BOND_LOCAL_SIZE;
 	// group_id is node i
 	const int node_id_i = get_group_id(0);
 
@@ -193,29 +236,25 @@ __kernel void
 
 	// If bond is not broken
 	if (node_id_j != -1) {
-		const double xi_x = r0[3 * node_id_j + 0] - r0[3 * node_id_i + 0];
-		const double xi_y = r0[3 * node_id_j + 1] - r0[3 * node_id_i + 1];
-		const double xi_z = r0[3 * node_id_j + 2] - r0[3 * node_id_i + 2];
+		// Vector loads of the (n,3) coordinate and displacement arrays
+		const double3 xi_vec_d = vload3(node_id_j, r0) - vload3(node_id_i, r0);
+		const double3 xi_eta_d = vload3(node_id_j, u) - vload3(node_id_i, u) + xi_vec_d;
 
-		const double xi_eta_x = u[3 * node_id_j + 0] - u[3 * node_id_i + 0] + xi_x;
-		const double xi_eta_y = u[3 * node_id_j + 1] - u[3 * node_id_i + 1] + xi_y;
-		const double xi_eta_z = u[3 * node_id_j + 2] - u[3 * node_id_i + 2] + xi_z;
+		const REAL3 xi_eta = convert_real3(xi_eta_d);
 
-		const double xi = sqrt(xi_x * xi_x + xi_y * xi_y + xi_z * xi_z);
-		const double y = sqrt(xi_eta_x * xi_eta_x + xi_eta_y * xi_eta_y + xi_eta_z * xi_eta_z);
-		const double s = (y -  xi)/ xi;
+		const REAL xi = bond_lengths[global_id];
+		const REAL y = sqrt(dot(xi_eta, xi_eta));
+		const REAL s = (y -  xi)/ xi;
 
         // Check for state of bonds here, and break it if necessary
 		if (s < critical_stretch) {
-            const double cx = xi_eta_x / y;
-		    const double cy = xi_eta_y / y;
-		    const double cz = xi_eta_z / y;
+            const REAL3 c = xi_eta / y;
 
 		    const double f = s * bond_stiffness * stiffness_corrections[global_id] * vols[node_id_j];
             // Copy bond forces into local memory
-		    local_cache_x[local_id] = f * cx;
-		    local_cache_y[local_id] = f * cy;
-		    local_cache_z[local_id] = f * cz;
+		    local_cache_x[local_id] = f * c.x;
+		    local_cache_y[local_id] = f * c.y;
+		    local_cache_z[local_id] = f * c.z;
 		}
         else {
             // bond is broken
@@ -262,12 +301,13 @@ __kernel void
 }
 
 
-__kernel void
+__kernel BOND_WORK_GROUP void
 	bond_force3(
     __global double const* u,
     __global double* force,
     __global double* body_force,
     __global double const* r0,
+    __global REAL const* bond_lengths,
     __global double const* vols,
 	__global int* nlist,
     __global int const* fc_types,
@@ -292,6 +332,7 @@ __kernel void
      * force - An (n,3) array of the current forces on the particles.
      * body_force - An (n,3) array of the current internal body forces of the particles.
      * r0 - An (n,3) array of the coordinates of the nodes in the initial state.
+     * bond_lengths - An (n, local_size) array of the lengths of the bonds in the initial state, in REAL precision.
      * vols - the volumes of each of the nodes.
      * nlist - An (n, local_size) array containing the neighbour lists,
      *     a value of -1 corresponds to a broken bond.
@@ -314,7 +355,7 @@ __kernel void
     // local_id is the LOCAL node id in range [0, max_neigh] of a node in this parent node's family
 	const int local_id = get_local_id(0);
     // local_size is the max_neigh, usually 128 or 256 depending on the problem
-    const int local_size = get_local_size(0);
+    const int local_size = BOND_LOCAL_SIZE;
     // group_id is node i
 	const int node_id_i = get_group_id(0);
 
@@ -322,24 +363,23 @@ __kernel void
 	// Access local node within node_id_i's horizon with corresponding node_id_j,
 	const int node_id_j = nlist[global_id];
 
-    // Find bond type, which chooses the damage model
-    const int bond_type = bond_types[global_id];
-    int regime = regimes[global_id];
-    const double current_critical_stretch = critical_stretch[bond_type * nregimes + regime];
-
 	// If bond is not broken
 	if (node_id_j != -1) {
-		const double xi_x = r0[3 * node_id_j + 0] - r0[3 * node_id_i + 0];
-		const double xi_y = r0[3 * node_id_j + 1] - r0[3 * node_id_i + 1];
-		const double xi_z = r0[3 * node_id_j + 2] - r0[3 * node_id_i + 2];
+		// Find bond type, which chooses the damage model. These are only read
+		// for unbroken bonds, so the padding of nlist costs a single load
+		const int bond_type = bond_types[global_id];
+		int regime = regimes[global_id];
+		const double current_critical_stretch = critical_stretch[bond_type * nregimes + regime];
+
+		// Vector loads of the (n,3) coordinate and displacement arrays
+		const double3 xi_vec_d = vload3(node_id_j, r0) - vload3(node_id_i, r0);
+		const double3 xi_eta_d = vload3(node_id_j, u) - vload3(node_id_i, u) + xi_vec_d;
 
-		const double xi_eta_x = u[3 * node_id_j + 0] - u[3 * node_id_i + 0] + xi_x;
-		const double xi_eta_y = u[3 * node_id_j + 1] - u[3 * node_id_i + 1] + xi_y;
-		const double xi_eta_z = u[3 * node_id_j + 2] - u[3 * node_id_i + 2] + xi_z;
+		const REAL3 xi_eta = convert_real3(xi_eta_d);
 
-		const double xi = sqrt(xi_x * xi_x + xi_y * xi_y + xi_z * xi_z);
-		const double y = sqrt(xi_eta_x * xi_eta_x + xi_eta_y * xi_eta_y + xi_eta_z * xi_eta_z);
-		const double s = (y -  xi)/ xi;
+		const REAL xi = bond_lengths[global_id];
+		const REAL y = sqrt(dot(xi_eta, xi_eta));
+		const REAL s = (y -  xi)/ xi;
 
         // Check for state of bonds
 		if (s < current_critical_stretch) {
@@ -366,15 +406,13 @@ __kernel void
             local_cache_z[local_id] = 0.00;
         }
         else{
-            const double cx = xi_eta_x / y;
-            const double cy = xi_eta_y / y;
-            const double cz = xi_eta_z / y;
+            const REAL3 c = xi_eta / y;
 
             const double f = (s * bond_stiffness[bond_type * nregimes + regime] + plus_cs[bond_type * nregimes + regime]) * vols[node_id_j];
             // Copy bond forces into local memory
-            local_cache_x[local_id] = f * cx;
-            local_cache_y[local_id] = f * cy;
-            local_cache_z[local_id] = f * cz;
+            local_cache_x[local_id] = f * c.x;
+            local_cache_y[local_id] = f * c.y;
+            local_cache_z[local_id] = f * c.z;
         }
     }
     // bond is broken
@@ -414,12 +452,13 @@ __kernel void
 }
 
 
-__kernel void
+__kernel BOND_WORK_GROUP void
 	bond_force4(
     __global double const* u,
     __global double* force,
     __global double* body_force,
     __global double const* r0,
+    __global REAL const* bond_lengths,
     __global double const* vols,
 	__global int* nlist,
     __global int const* fc_types,
@@ -444,6 +483,7 @@ __kernel void
      * force - An (n,3) array of the current forces on the particles.
      * body_force - An (n,3) array of the current internal body forces of the particles.
      * r0 - An (n,3) array of the coordinates of the nodes in the initial state.
+     * bond_lengths - An (n, local_size) array of the lengths of the bonds in the initial state, in REAL precision.
      * vols - the volumes of each of the nodes.
      * nlist - An (n, local_size) array containing the neighbour lists,
      *     a value of -1 corresponds to a broken bond.
@@ -466,31 +506,30 @@ __kernel void
     // local_id is the LOCAL node id in range [0, max_neigh] of a node in this parent node's family
 	const int local_id = get_local_id(0);
     // local_size is the max_neigh, usually 128 or 256 depending on the problem
-    const int local_size = get_local_size(0);
+    const int local_size = BOND_LOCAL_SIZE;
     // group_id is node i
 	const int node_id_i = get_group_id(0);
 
 	// Access local node within node_id_i's horizon with corresponding node_id_j,
 	const int node_id_j = nlist[global_id];
 
-    // Find bond type, which chooses the damage model
-    const int bond_type = bond_types[global_id];
-    int regime = regimes[global_id];
-    const double current_critical_stretch = critical_stretch[bond_type * nregimes + regime];
-
 	// If bond is not broken
 	if (node_id_j != -1) {
-		const double xi_x = r0[3 * node_id_j + 0] - r0[3 * node_id_i + 0];
-		const double xi_y = r0[3 * node_id_j + 1] - r0[3 * node_id_i + 1];
-		const double xi_z = r0[3 * node_id_j + 2] - r0[3 * node_id_i + 2];
+		// Find bond type, which chooses the damage model. These are only read
+		// for unbroken bonds, so the padding of nlist costs a single load
+		const int bond_type = bond_types[global_id];
+		int regime = regimes[global_id];
+		const double current_critical_stretch = critical_stretch[bond_type * nregimes + regime];
+
+		// Vector loads of the (n,3) coordinate and displacement arrays
+		const double3 xi_vec_d = vload3(node_id_j, r0) - vload3(node_id_i, r0);
+		const double3 xi_eta_d = vload3(node_id_j, u) - vload3(node_id_i, u) + xi_vec_d;
 
-		const double xi_eta_x = u[3 * node_id_j + 0] - u[3 * node_id_i + 0] + xi_x;
-		const double xi_eta_y = u[3 * node_id_j + 1] - u[3 * node_id_i + 1] + xi_y;
-		const double xi_eta_z = u[3 * node_id_j + 2] - u[3 * node_id_i + 2] + xi_z;
+		const REAL3 xi_eta = convert_real3(xi_eta_d);
 
-		const double xi = sqrt(xi_x * xi_x + xi_y * xi_y + xi_z * xi_z);
-		const double y = sqrt(xi_eta_x * xi_eta_x + xi_eta_y * xi_eta_y + xi_eta_z * xi_eta_z);
-		const double s = (y -  xi)/ xi;
+		const REAL xi = bond_lengths[global_id];
+		const REAL y = sqrt(dot(xi_eta, xi_eta));
+		const REAL s = (y -  xi)/ xi;
 
         // Check for state of bonds
 		if (s < current_critical_stretch) {
@@ -517,15 +556,13 @@ __kernel void
             local_cache_z[local_id] = 0.00;
         }
         else{
-            const double cx = xi_eta_x / y;
-            const double cy = xi_eta_y / y;
-            const double cz = xi_eta_z / y;
+            const REAL3 c = xi_eta / y;
 
             const double f = (s * bond_stiffness[bond_type * nregimes + regime] + plus_cs[bond_type * nregimes + regime]) * stiffness_corrections[global_id] * vols[node_id_j];
             // Copy bond forces into local memory
-            local_cache_x[local_id] = f * cx;
-            local_cache_y[local_id] = f * cy;
-            local_cache_z[local_id] = f * cz;
+            local_cache_x[local_id] = f * c.x;
+            local_cache_y[local_id] = f * c.y;
+            local_cache_z[local_id] = f * c.z;
         }
     }
     // bond is broken
@@ -565,12 +602,12 @@ __kernel void
 }
 
 
-__kernel void damage(
+__kernel BOND_WORK_GROUP void damage(
         __global int const *nlist,
 		__global int const *family,
         __global int *n_neigh,
         __global double *damage,
-        __local double* local_cache
+        __local int* local_cache
     )
 {
     /* Calculate the damage of each node.
@@ -581,13 +618,13 @@ __kernel void damage(
      * n_neigh - An (n) array of the number of neighbours (particles bound) for
      *     each node.
      * damage - An (n) array of the damage for each node. 
-     * local_cache - local (local_size) array to store the bond breakages.*/
+     * local_cache - local (local_size) array to count the unbroken bonds.*/
     int global_id = get_global_id(0); 
     int local_id = get_local_id(0); 
-    int local_size = get_local_size(0); 
+    int local_size = BOND_LOCAL_SIZE; 
     
     //Copy values into local memory 
-    local_cache[local_id] = nlist[global_id] != -1 ? 1.00 : 0.00; 
+    local_cache[local_id] = nlist[global_id] != -1 ? 1 : 0;
 
     //Wait for all threads to catch up 
     barrier(CLK_LOCAL_MEM_FENCE);
@@ -1,4 +1,6 @@
 """Utilities for using the OpenCL kernels."""
+from pyopencl import mem_flags as mf
+import numpy as np
 import pyopencl as cl
 import sys
 
@@ -44,6 +46,53 @@ def get_context():
     return None
 
 
+def pinned_empty(context, queue, shape, dtype):
+    """
+    Allocate an uninitialised array in page-locked (pinned) host memory.
+
+    Copies between the device and page-locked host memory avoid the
+    intermediate staging copy made by the driver for pageable memory. The
+    host buffer remains mapped until it is released with
+    :func:`pinned_release`, after which the array must not be used.
+
+    :arg context: The OpenCL context in which to allocate the buffer.
+    :type context: :class:`pyopencl._cl.Context`
+    :arg queue: The command queue used to map the buffer.
+    :type queue: :class:`pyopencl._cl.CommandQueue`
+    :arg shape: The shape of the array.
+    :type shape: tuple(int) or int
+    :arg dtype: The data type of the array.
+    :type dtype: :class:`numpy.dtype`
+
+    :returns: An array backed by page-locked host memory.
+    :rtype: :class:`numpy.ndarray`
+    """
+    nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    buffer = cl.Buffer(context, mf.READ_WRITE | mf.ALLOC_HOST_PTR, nbytes)
+    array, _ = cl.enqueue_map_buffer(
+        queue, buffer, cl.map_flags.READ | cl.map_flags.WRITE, 0, shape,
+        dtype)
+    return array
+
+
+def pinned_release(queue, array):
+    """
+    Unmap an array allocated by :func:`pinned_empty`.
+
+    The page-locked host memory is freed once the array is no longer
+    referenced. The array must not be used after it has been released.
+
+    :arg queue: The command queue used to unmap the buffer.
+    :type queue: :class:`pyopencl._cl.CommandQueue`
+    :arg array: The array backed by page-locked host memory.
+    :type array: :class:`numpy.ndarray`
+
+    :returns: None
+    :rtype: NoneType
+    """
+    array.base.release(queue)
+
+
 def output_device_info(device_id):
     """Output the device info of the device."""
     sys.stdout.write("Device is ")
@@ -1,5 +1,9 @@
 #pragma OPENCL EXTENSION cl_khr_fp64 : enable
 
+// NDOF, the total number of degrees of freedom, may be defined at build time
+// so that the kernel can be enqueued with a global size padded to a multiple
+// of an explicit work-group size
+
 __kernel void
 	update_displacement(
         __global double const* force,
@@ -28,6 +32,13 @@ __kernel void
      * dt - The time step in [s]. */
 	const int i = get_global_id(0);
 
+#ifdef NDOF
+    // The global size is padded to a multiple of the work-group size
+    if (i >= NDOF) {
+        return;
+    }
+#endif
+
     double const ud1 = ud[i] + (dt / 2) * udd[i]; // Half-step velocity
     double const udd1 = (force[i] - damping * ud1) / densities[i];
     ud[i] = ud1 + (dt / 2) * udd1; // Full-step velocity
@@ -1,8 +1,9 @@
 """Integrators."""
 from abc import ABC, abstractmethod
-from .cl import double_fp_support, get_context, output_device_info
+from .cl import (double_fp_support, get_context, output_device_info,
+                 pinned_empty, pinned_release)
 from pyopencl import mem_flags as mf
-from .peridynamics import damage, bond_force, update_displacement, break_bonds
+from .peridynamics import damage, bond_force_break_bonds, update_displacement
 import pyopencl as cl
 import pathlib
 import numpy as np
@@ -19,10 +20,14 @@ class Integrator(ABC):
     step, a `_build_special` method which builds the OpenCL programs which are
     special to the integrator, and a `_create_special_buffers` method which
     creates the OpenCL buffers which are special to the integrator.
+
+    The state variables of OpenCL integrators are resident in device memory
+    for the whole simulation. The call method should only enqueue kernels,
+    the state variables are copied to the host by :meth:`write`.
     """
 
     @abstractmethod
-    def __init__(self, dt, context=None):
+    def __init__(self, dt, context=None, dtype=np.float64):
         """
         Create an :class:`Integrator` object.
 
@@ -32,11 +37,29 @@ class Integrator(ABC):
         :arg context: Optional argument for the user to provide a context with
             a single suitable device, default is None.
         :type context: :class:`pyopencl._cl.Context` or NoneType
+        :arg dtype: The floating-point precision in which the bond stretches
+            and bond forces are evaluated, either :class:`numpy.float64` or
+            :class:`numpy.float32`. The state variables are stored, and the
+            bond forces are summed, in double precision regardless. Single
+            precision is much faster on many GPUs, at the cost of an absolute
+            error of around 1e-7 in the bond stretches, which is large
+            relative to small stretches. Default :class:`numpy.float64`.
+        :type dtype: :class:`numpy.dtype`
 
         :returns: A :class:`Integrator` object
         """
         self.dt = dt
 
+        if np.dtype(dtype) == np.float64:
+            self.dtype = np.dtype(np.float64)
+            self.real = "double"
+        elif np.dtype(dtype) == np.float32:
+            self.dtype = np.dtype(np.float32)
+            self.real = "float"
+        else:
+            raise ValueError("dtype must be numpy.float64 or numpy.float32 "
+                             "(got {})".format(dtype))
+
         # Get an OpenCL context if none was provided
         if context is None:
             self.context = get_context()
@@ -56,6 +79,9 @@ class Integrator(ABC):
         output_device_info(self.context.devices[0])
 
         self.queue = cl.CommandQueue(self.context)
+        # A second queue for device to host copies, so that they can overlap
+        # with kernels running on self.queue
+        self.transfer_queue = cl.CommandQueue(self.context)
 
     @abstractmethod
     def __call__(self):
@@ -95,15 +121,23 @@ class Integrator(ABC):
         self.nnodes = nnodes
         self.degrees_freedom = degrees_freedom
         self.max_neighbours = max_neighbours
+        self.coords = coords
         self.densities = densities
 
         kernel_source = open(
             pathlib.Path(__file__).parent.absolute() /
             "cl/peridynamics.cl").read()
 
-        # Build kernels
+        # Build kernels, the work-group size of the bond_force and damage
+        # kernels is fixed at build time
         self.program = cl.Program(
-            self.context, kernel_source).build()
+            self.context, kernel_source).build(
+                ["-DREAL={}".format(self.real),
+                 "-DMAX_NEIGHBOURS={}".format(self.max_neighbours)])
+        # Global and local work sizes of the bond_force and damage kernels,
+        # one work-group of max_neighbours work-items per node
+        self.bond_sizes = (
+            (self.nnodes * self.max_neighbours,), (self.max_neighbours,))
 
         # Build bond_force program
         if (stiffness_corrections is None) and (bond_types is None):
@@ -158,9 +192,10 @@ class Integrator(ABC):
             np.dtype(np.float64).itemsize * self.max_neighbours)
         self.local_mem_z = cl.LocalMemory(
             np.dtype(np.float64).itemsize * self.max_neighbours)
-        # Local memory container for damage
+        # Local memory container for damage, the unbroken bonds are counted
+        # in integers
         self.local_mem = cl.LocalMemory(
-            np.dtype(np.float64).itemsize * self.max_neighbours)
+            np.dtype(np.intc).itemsize * self.max_neighbours)
         # Read only
         self.r0_d = cl.Buffer(
             self.context, mf.READ_ONLY | mf.COPY_HOST_PTR,
@@ -234,6 +269,10 @@ class Integrator(ABC):
         self.nlist_d = cl.Buffer(
             self.context, mf.READ_WRITE | mf.COPY_HOST_PTR,
             hostbuf=nlist)
+        # Read only
+        self.bond_lengths_d = cl.Buffer(
+            self.context, mf.READ_ONLY | mf.COPY_HOST_PTR,
+            hostbuf=self._bond_lengths(nlist))
         self.u_d = cl.Buffer(
             self.context, mf.READ_WRITE | mf.COPY_HOST_PTR,
             hostbuf=u)
@@ -251,54 +290,186 @@ class Integrator(ABC):
         self.n_neigh_d = cl.Buffer(
             self.context, mf.WRITE_ONLY, n_neigh.nbytes)
 
+        # Page-locked host arrays that the state variables are copied into by
+        # periodic calls to :meth:`write`. The connectivity is only copied at
+        # the end of a simulation, straight into the caller's arrays.
+        self.u_h = pinned_empty(self.context, self.queue, u.shape, u.dtype)
+        self.ud_h = pinned_empty(self.context, self.queue, ud.shape, ud.dtype)
+        self.udd_h = pinned_empty(
+            self.context, self.queue, udd.shape, udd.dtype)
+        self.force_h = pinned_empty(
+            self.context, self.queue, force.shape, force.dtype)
+        self.body_force_h = pinned_empty(
+            self.context, self.queue, body_force.shape, body_force.dtype)
+        self.damage_h = pinned_empty(
+            self.context, self.queue, damage.shape, damage.dtype)
+
         self._create_special_buffers()
 
+        # Set the kernel arguments which are constant for the simulation
+        self._set_kernel_args()
+
+    def _work_sizes(self, kernel, n):
+        """
+        Choose the global and local work sizes of an element-wise kernel.
+
+        The local work size is the largest multiple of the preferred
+        work-group size multiple of the device which does not exceed the
+        maximum work-group size of the kernel, or 256. The global work size
+        is padded to a multiple of the local work size, so the kernel must
+        guard against out of range work-items.
+
+        :arg kernel: The kernel.
+        :type kernel: :class:`pyopencl.Kernel`
+        :arg int n: The number of entries.
+
+        :returns: A tuple of the global work size and local work size.
+        :rtype: tuple(tuple(int), tuple(int))
+        """
+        device = self.context.devices[0]
+        multiple = kernel.get_work_group_info(
+            cl.kernel_work_group_info.PREFERRED_WORK_GROUP_SIZE_MULTIPLE,
+            device)
+        max_size = kernel.get_work_group_info(
+            cl.kernel_work_group_info.WORK_GROUP_SIZE, device)
+        local_size = max(min(max_size, 256) // multiple, 1) * multiple
+        local_size = min(local_size, max_size)
+        global_size = -(-n // local_size) * local_size
+        return (global_size,), (local_size,)
+
+    def _bond_lengths(self, nlist):
+        """
+        Calculate the length of each bond in the initial state.
+
+        The bond stretch kernels read these in place of recalculating them at
+        every time-step.
+
+        :arg nlist: The neighbour list.
+        :type nlist: :class:`numpy.ndarray`
+
+        :returns: A (`nodes`, `max_neighbours`) array of the lengths of the
+            bonds, in the same layout as `nlist` and in the precision of
+            :attr:`dtype`. Entries of broken bonds are zero.
+        :rtype: :class:`numpy.ndarray`
+        """
+        bond_lengths = np.zeros(nlist.shape, dtype=np.float64)
+        for dim in range(self.coords.shape[1]):
+            xi = self.coords[nlist, dim] - self.coords[:, dim, np.newaxis]
+            bond_lengths += xi * xi
+        bond_lengths = np.sqrt(bond_lengths)
+        bond_lengths[nlist == -1] = 0.0
+        return bond_lengths.astype(self.dtype)
+
+    def _set_kernel_args(self):
+        """
+        Set the kernel arguments which are constant for the simulation.
+
+        The kernel arguments are set once, after the buffers have been
+        created, so that only the arguments which change between time-steps
+        are set when the kernels are enqueued. Integrators with special
+        kernels should extend this method.
+        """
+        # The force boundary condition magnitude, argument 18, is set by
+        # :meth:`_bond_force`
+        self.bond_force_kernel.set_args(
+            self.u_d, self.force_d, self.body_force_d, self.r0_d,
+            self.bond_lengths_d, self.vols_d, self.nlist_d,
+            self.force_bc_types_d, self.force_bc_values_d,
+            self.stiffness_corrections_d, self.bond_types_d, self.regimes_d,
+            self.plus_cs_d, self.local_mem_x, self.local_mem_y,
+            self.local_mem_z, self.bond_stiffness_d, self.critical_stretch_d,
+            np.float64(0.0), self.nregimes)
+
     def _damage(self, nlist_d, family_d, n_neigh_d, damage_d, local_mem):
         """Calculate bond damage."""
         queue = self.queue
         # Call kernel
-        self.damage_kernel(
-            queue, (self.nnodes * self.max_neighbours,),
-            (self.max_neighbours,), nlist_d, family_d, n_neigh_d, damage_d,
+        return self.damage_kernel(
+            queue, *self.bond_sizes, nlist_d, family_d, n_neigh_d, damage_d,
             local_mem)
-        queue.finish()
-
-    def _bond_force(
-            self, u_d, force_d, body_force_d, r0_d, vols_d, nlist_d,
-            force_bc_types_d, force_bc_values_d, stiffness_corrections_d,
-            bond_types_d, regimes_d, plus_cs_d, local_mem_x, local_mem_y,
-            local_mem_z, bond_stiffness_d, critical_stretch_d,
-            force_bc_magnitude, nregimes):
+
+    def _bond_force(self, force_bc_magnitude):
         """Calculate the force due to bonds acting on each node."""
-        queue = self.queue
+        self.bond_force_kernel.set_arg(18, np.float64(force_bc_magnitude))
         # Call kernel
-        self.bond_force_kernel(
-                queue, (self.nnodes * self.max_neighbours,),
-                (self.max_neighbours,), u_d, force_d, body_force_d, r0_d,
-                vols_d, nlist_d, force_bc_types_d, force_bc_values_d,
-                stiffness_corrections_d, bond_types_d, regimes_d, plus_cs_d,
-                local_mem_x, local_mem_y, local_mem_z, bond_stiffness_d,
-                critical_stretch_d, np.float64(force_bc_magnitude),
-                np.intc(nregimes))
-        queue.finish()
-
-    def write(self, u, ud, udd, force, body_force, damage, nlist, n_neigh):
-        """Copy the state variables from device memory to host memory."""
+        return cl.enqueue_nd_range_kernel(
+            self.queue, self.bond_force_kernel, *self.bond_sizes)
+
+    def write(self, u, ud, udd, force, body_force, damage, nlist, n_neigh,
+              connectivity=True, pinned=False):
+        """
+        Copy the state variables from device memory to host memory.
+
+        The state variables are copied into the arrays passed as arguments,
+        which are returned.
+
+        :arg bool connectivity: Whether to copy the connectivity, `nlist` and
+            `n_neigh`. If False, the `nlist` and `n_neigh` arguments are
+            returned unchanged. Default True.
+        :arg bool pinned: Whether to copy the state variables, other than the
+            connectivity, into page-locked host arrays owned by the
+            integrator. These are returned in place of the arrays passed as
+            arguments, and are overwritten by each call. This is faster for
+            periodic writes. Default False.
+        """
         queue = self.queue
+        transfer_queue = self.transfer_queue
+        # Kernels are not synchronised on the host, this marker completes
+        # once every preceding time-step has completed
+        step_event = cl.enqueue_marker(queue)
+
         # Calculate the damage
-        self._damage(self.nlist_d, self.family_d, self.n_neigh_d,
-                     self.damage_d, self.local_mem)
-
-        cl.enqueue_copy(queue, damage, self.damage_d)
-        cl.enqueue_copy(queue, u, self.u_d)
-        cl.enqueue_copy(queue, ud, self.ud_d)
-        cl.enqueue_copy(queue, udd, self.udd_d)
-        cl.enqueue_copy(queue, force, self.force_d)
-        cl.enqueue_copy(queue, body_force, self.body_force_d)
-        cl.enqueue_copy(queue, nlist, self.nlist_d)
-        cl.enqueue_copy(queue, n_neigh, self.n_neigh_d)
+        damage_event = self._damage(
+            self.nlist_d, self.family_d, self.n_neigh_d, self.damage_d,
+            self.local_mem)
+        # The copies on the transfer queue wait on events of this queue, which
+        # must be submitted to the device first
+        queue.flush()
+
+        # Copies of the variables not written by the damage kernel overlap
+        # with it on the transfer queue. All copies are issued without
+        # blocking and waited on together.
+        if pinned:
+            (u, ud, udd, force, body_force, damage) = (
+                self.u_h, self.ud_h, self.udd_h, self.force_h,
+                self.body_force_h, self.damage_h)
+        copies = [
+            (u, self.u_d, step_event),
+            (ud, self.ud_d, step_event),
+            (udd, self.udd_d, step_event),
+            (force, self.force_d, step_event),
+            (body_force, self.body_force_d, step_event),
+            (damage, self.damage_d, damage_event)
+            ]
+        if connectivity:
+            copies.extend([
+                (nlist, self.nlist_d, step_event),
+                (n_neigh, self.n_neigh_d, damage_event)
+                ])
+        cl.wait_for_events([
+            cl.enqueue_copy(
+                transfer_queue, host_array, buffer, is_blocking=False,
+                wait_for=[event])
+            for host_array, buffer, event in copies])
+
         return (u, ud, udd, force, body_force, damage, nlist, n_neigh)
 
+    def release_host_arrays(self):
+        """
+        Release the page-locked host arrays created by :meth:`create_buffers`.
+
+        The arrays returned by :meth:`write` with `pinned` must not be used
+        after they have been released, copy them first if they are needed.
+        """
+        host_arrays = [
+            self.u_h, self.ud_h, self.udd_h, self.force_h, self.body_force_h,
+            self.damage_h]
+        for host_array in host_arrays:
+            pinned_release(self.queue, host_array)
+        self.queue.finish()
+        self.u_h = self.ud_h = self.udd_h = self.force_h = None
+        self.body_force_h = self.damage_h = None
+
 
 class Euler(Integrator):
     r"""
@@ -336,13 +507,13 @@ class Euler(Integrator):
         :arg float force_bc_magnitude: the magnitude applied to the force
             boundary conditions for the current time-step.
         """
-        # Update neighbour list
-        self._break_bonds(
-            self.u, self.nlist, self.n_neigh)
+        # Update the current coordinates in place
+        np.add(self.coords, self.u, out=self.r)
 
-        # Calculate the force due to bonds on each node
-        self.force = self._bond_force(
-            force_bc_magnitude, self.u, self.nlist, self.n_neigh)
+        # Update neighbour list and calculate the force due to bonds on each
+        # node
+        self._bond_force(
+            force_bc_magnitude, self.r, self.nlist, self.n_neigh, self.force)
 
         # Conduct one integration step
         self._update_displacement(
@@ -378,6 +549,8 @@ class Euler(Integrator):
         self.udd = udd
         self.force = force
         self.body_force = body_force
+        # Current coordinates, reused by every time-step
+        self.r = np.empty_like(u)
 
     def build(
             self, nnodes, degrees_freedom, max_neighbours, coords, volume,
@@ -435,29 +608,38 @@ class Euler(Integrator):
             u, self.bc_values, self.bc_types, force, displacement_bc_magnitude,
             self.dt)
 
-    def _break_bonds(self, u, nlist, n_neigh):
-        """Break bonds which have exceeded the critical strain."""
-        break_bonds(self.coords+u, self.coords, nlist, n_neigh,
-                    self.critical_stretch)
-
     def _damage(self, n_neigh):
         """Calculate bond damage."""
         return damage(n_neigh, self.family)
 
-    def _bond_force(self, force_bc_magnitude, u, nlist, n_neigh):
-        """Calculate the force due to bonds acting on each node."""
-        force = bond_force(
-            self.coords+u, self.coords, nlist, n_neigh,
-            self.volume, self.bond_stiffness, self.force_bc_values,
-            self.force_bc_types, force_bc_magnitude)
-        return force
-
-    def write(self, damage, u, ud, udd, force, body_force, nlist, n_neigh):
-        """Return the state variable arrays."""
+    def _bond_force(self, force_bc_magnitude, r, nlist, n_neigh, force):
+        """
+        Calculate the force due to bonds acting on each node.
+
+        Bonds which have exceeded the critical strain are broken in the same
+        pass. The force is written into `force` in place.
+        """
+        bond_force_break_bonds(
+            r, self.coords, nlist, n_neigh, self.volume, self.bond_stiffness,
+            self.critical_stretch, self.force_bc_values, self.force_bc_types,
+            force_bc_magnitude, force)
+
+    def write(self, damage, u, ud, udd, force, body_force, nlist, n_neigh,
+              connectivity=True, pinned=False):
+        """
+        Return the state variable arrays.
+
+        The state is held in host memory, so `connectivity` and `pinned` have
+        no effect.
+        """
         damage = self._damage(self.n_neigh)
         return (self.u, self.ud, self.udd, self.force, self.body_force, damage,
                 self.nlist, self.n_neigh)
 
+    def release_host_arrays(self):
+        """Release host arrays, the state is held in ordinary arrays."""
+        # There are none
+
 
 class EulerCL(Integrator):
     r"""
@@ -490,17 +672,9 @@ class EulerCL(Integrator):
         :arg float force_bc_magnitude: the magnitude applied to the force
             boundary conditions for the current time-step.
         """
-        self._bond_force(
-            self.u_d, self.force_d, self.body_force_d, self.r0_d, self.vols_d,
-            self.nlist_d, self.force_bc_types_d, self.force_bc_values_d,
-            self.stiffness_corrections_d, self.bond_types_d, self.regimes_d,
-            self.plus_cs_d, self.local_mem_x, self.local_mem_y,
-            self.local_mem_z, self.bond_stiffness_d, self.critical_stretch_d,
-            force_bc_magnitude, self.nregimes)
+        self._bond_force(force_bc_magnitude)
 
-        self._update_displacement(
-            self.force_d, self.u_d, self.bc_types_d, self.bc_values_d,
-            displacement_bc_magnitude, self.dt)
+        self._update_displacement(displacement_bc_magnitude)
 
     def _build_special(self):
         """Build OpenCL kernels special to the Euler integrator."""
@@ -520,25 +694,34 @@ class EulerCL(Integrator):
 
         # Build kernels
         self.euler = cl.Program(
-            self.context, kernel_source).build()
+            self.context, kernel_source).build(
+                ["-DNDOF={}".format(self.degrees_freedom * self.nnodes)])
         self.update_displacement_kernel = self.euler.update_displacement
+        self.update_displacement_sizes = self._work_sizes(
+            self.update_displacement_kernel,
+            self.degrees_freedom * self.nnodes)
 
     def _create_special_buffers(self):
         """Create buffers special to the Euler integrator."""
         # There are none
 
-    def _update_displacement(
-            self, force_d, u_d, bc_types_d, bc_values_d,
-            displacement_bc_magnitude, dt):
+    def _set_kernel_args(self):
+        """Set the kernel arguments which are constant for the simulation."""
+        super()._set_kernel_args()
+        # The displacement boundary condition magnitude, argument 4, is set
+        # by :meth:`_update_displacement`
+        self.update_displacement_kernel.set_args(
+            self.force_d, self.u_d, self.bc_types_d, self.bc_values_d,
+            np.float64(0.0), np.float64(self.dt))
+
+    def _update_displacement(self, displacement_bc_magnitude):
         """Update displacements."""
-        queue = self.queue
+        self.update_displacement_kernel.set_arg(
+            4, np.float64(displacement_bc_magnitude))
         # Call kernel
-        self.update_displacement_kernel(
-                self.queue, (self.degrees_freedom * self.nnodes,), None,
-                force_d, u_d, bc_types_d, bc_values_d,
-                np.float64(displacement_bc_magnitude), np.float64(dt))
-        queue.finish()
-        return u_d
+        return cl.enqueue_nd_range_kernel(
+            self.queue, self.update_displacement_kernel,
+            *self.update_displacement_sizes)
 
 
 class EulerCromerCL(Integrator):
@@ -592,18 +775,9 @@ class EulerCromerCL(Integrator):
         :arg float force_bc_magnitude: the magnitude applied to the force
             boundary conditions for the current time-step.
         """
-        self._bond_force(
-            self.u_d, self.force_d, self.body_force_d, self.r0_d, self.vols_d,
-            self.nlist_d, self.force_bc_types_d, self.force_bc_values_d,
-            self.stiffness_corrections_d, self.bond_types_d, self.regimes_d,
-            self.plus_cs_d, self.local_mem_x, self.local_mem_y,
-            self.local_mem_z, self.bond_stiffness_d, self.critical_stretch_d,
-            force_bc_magnitude, self.nregimes)
+        self._bond_force(force_bc_magnitude)
 
-        self._update_displacement(
-            self.force_d, self.u_d, self.ud_d, self.udd_d, self.bc_types_d,
-            self.bc_values_d, self.densities_d, displacement_bc_magnitude,
-            self.damping, self.dt)
+        self._update_displacement(displacement_bc_magnitude)
 
     def _build_special(self):
         """Build OpenCL kernels special to the Euler integrator."""
@@ -625,27 +799,35 @@ class EulerCromerCL(Integrator):
 
         # Build kernels
         self.euler_cromer = cl.Program(
-            self.context, kernel_source).build()
+            self.context, kernel_source).build(
+                ["-DNDOF={}".format(self.degrees_freedom * self.nnodes)])
         self.update_displacement_kernel = self.euler_cromer.update_displacement
+        self.update_displacement_sizes = self._work_sizes(
+            self.update_displacement_kernel,
+            self.degrees_freedom * self.nnodes)
 
     def _create_special_buffers(self):
         """Create buffers special to the Euler integrator."""
         # There are none
 
-    def _update_displacement(
-            self, force_d, u_d, ud_d, udd_d, bc_types_d, bc_values_d,
-            densities_d, displacement_bc_magnitude, damping, dt):
+    def _set_kernel_args(self):
+        """Set the kernel arguments which are constant for the simulation."""
+        super()._set_kernel_args()
+        # The displacement boundary condition magnitude, argument 7, is set
+        # by :meth:`_update_displacement`
+        self.update_displacement_kernel.set_args(
+            self.force_d, self.u_d, self.ud_d, self.udd_d, self.bc_types_d,
+            self.bc_values_d, self.densities_d, np.float64(0.0),
+            np.float64(self.damping), np.float64(self.dt))
+
+    def _update_displacement(self, displacement_bc_magnitude):
         """Update displacements."""
-        queue = self.queue
+        self.update_displacement_kernel.set_arg(
+            7, np.float64(displacement_bc_magnitude))
         # Call kernel
-        self.update_displacement_kernel(
-                self.queue, (self.degrees_freedom * self.nnodes,), None,
-                force_d, u_d, ud_d, udd_d, bc_types_d, bc_values_d,
-                densities_d, np.float64(displacement_bc_magnitude),
-                np.float64(damping), np.float64(dt)
-                )
-        queue.finish()
-        return u_d
+        return cl.enqueue_nd_range_kernel(
+            self.queue, self.update_displacement_kernel,
+            *self.update_displacement_sizes)
 
 
 class VelocityVerletCL(Integrator):
@@ -706,18 +888,9 @@ class VelocityVerletCL(Integrator):
         :arg float force_bc_magnitude: the magnitude applied to the force
             boundary conditions for the current time-step.
         """
-        self._bond_force(
-            self.u_d, self.force_d, self.body_force_d, self.r0_d, self.vols_d,
-            self.nlist_d, self.force_bc_types_d, self.force_bc_values_d,
-            self.stiffness_corrections_d, self.bond_types_d, self.regimes_d,
-            self.plus_cs_d, self.local_mem_x, self.local_mem_y,
-            self.local_mem_z, self.bond_stiffness_d, self.critical_stretch_d,
-            force_bc_magnitude, self.nregimes)
+        self._bond_force(force_bc_magnitude)
 
-        self._update_displacement(
-            self.force_d, self.u_d, self.ud_d, self.udd_d, self.bc_types_d,
-            self.bc_values_d, self.densities_d, displacement_bc_magnitude,
-            self.damping, self.dt)
+        self._update_displacement(displacement_bc_magnitude)
 
     def _build_special(self):
         """Build OpenCL kernels special to the Euler integrator."""
@@ -739,29 +912,37 @@ class VelocityVerletCL(Integrator):
 
         # Build kernels
         self.euler_cromer = cl.Program(
-            self.context, kernel_source).build()
+            self.context, kernel_source).build(
+                ["-DNDOF={}".format(self.degrees_freedom * self.nnodes)])
         self.update_displacement_kernel = self.euler_cromer.update_displacement
         self.partial_update_displacement_kernel = (
             self.euler_cromer.update_displacement)
+        self.update_displacement_sizes = self._work_sizes(
+            self.update_displacement_kernel,
+            self.degrees_freedom * self.nnodes)
 
     def _create_special_buffers(self):
         """Create buffers special to the Euler integrator."""
         # There are none
 
-    def _update_displacement(
-            self, force_d, u_d, ud_d, udd_d, bc_types_d, bc_values_d,
-            densities_d, displacement_bc_magnitude, damping, dt):
+    def _set_kernel_args(self):
+        """Set the kernel arguments which are constant for the simulation."""
+        super()._set_kernel_args()
+        # The displacement boundary condition magnitude, argument 7, is set
+        # by :meth:`_update_displacement`
+        self.update_displacement_kernel.set_args(
+            self.force_d, self.u_d, self.ud_d, self.udd_d, self.bc_types_d,
+            self.bc_values_d, self.densities_d, np.float64(0.0),
+            np.float64(self.damping), np.float64(self.dt))
+
+    def _update_displacement(self, displacement_bc_magnitude):
         """Update displacements."""
-        queue = self.queue
+        self.update_displacement_kernel.set_arg(
+            7, np.float64(displacement_bc_magnitude))
         # Call kernel
-        self.update_displacement_kernel(
-                self.queue, (self.degrees_freedom * self.nnodes,), None,
-                force_d, u_d, ud_d, udd_d, bc_types_d, bc_values_d,
-                densities_d, np.float64(displacement_bc_magnitude),
-                np.float64(damping), np.float64(dt)
-                )
-        queue.finish()
-        return u_d
+        return cl.enqueue_nd_range_kernel(
+            self.queue, self.update_displacement_kernel,
+            *self.update_displacement_sizes)
 
 
 class ContextError(Exception):
@@ -7,6 +7,7 @@ from .correction import (set_volume_correction,
                          set_precise_surface_correction,
                          set_micromodulus_function)
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pathlib
 from tqdm import trange
@@ -1273,6 +1274,8 @@ class Model(object):
             for each of the writes (read 'over time'), for each unique
             tip_type (read 'for each of the set of nodes the user has
             chosen to measure datum for, as defined by the `is_tip` function).
+            The arrays are ordinary, pageable, arrays which are not
+            overwritten by later simulations.
         :rtype: tuple(
             :class:`numpy.ndarray`, :class:`numpy.ndarray`,
             tuple(:class:`numpy.ndarray`, :class:`numpy.ndarray`),
@@ -1296,95 +1299,123 @@ class Model(object):
              displacement_bc_magnitudes, force_bc_magnitudes, connectivity,
              bond_stiffness, critical_stretch, write_path)
 
-        for step in trange(first_step, first_step+steps,
-                           desc="Simulation Progress", unit="steps"):
-
-            # Call one integration step
-            self.integrator(
-                displacement_bc_magnitudes[step - 1],
-                force_bc_magnitudes[step - 1])
-
-            if write:
-                if step % write == 0:
-                    (u,
-                     ud,
-                     udd,
-                     force,
-                     body_force,
-                     damage,
-                     nlist,
-                     n_neigh) = self.integrator.write(
-                         u, ud, udd, body_force, force, damage, nlist, n_neigh)
-
-                    self.write_mesh(write_path/f"U_{step}.vtk", damage, u)
-
-                    # Write index number
-                    ii = step // write - (first_step - 1) // write - 1
-
-                    for tip_type, node_list in self.tip_types.items():
-                        if tip_type not in data:
-                            # Build data dict for this tip type
-                            data[tip_type] = {
-                                'displacement': np.zeros(
-                                    nwrites, dtype=np.float64),
-                                'velocity': np.zeros(
-                                    nwrites, dtype=np.float64),
-                                'acceleration': np.zeros(
-                                    nwrites, dtype=np.float64),
-                                'force': np.zeros(
-                                    nwrites, dtype=np.float64),
-                                'body_force': np.zeros(
-                                    nwrites, dtype=np.float64)
-                                }
-                        for node in node_list:
-                            i, j = node
-                            # Add to tip data for the write index, ii
-                            data[tip_type]['displacement'][ii] += (
-                                u[i, j])
-                            data[tip_type]['velocity'][ii] += (
-                                ud[i, j])
-                            data[tip_type]['acceleration'][ii] += (
-                                udd[i, j])
-                            data[tip_type]['force'][ii] += (
-                                force[i, j] * self.volume[i])
-                            data[tip_type]['body_force'][ii] += (
-                                body_force[i, j] * self.volume[i])
-
-                    # Add to model data for the write index, ii
-                    data['model']['step'][ii] = step
-                    data['model']['displacement'][ii] = np.sum(u)
-                    data['model']['velocity'][ii] = np.sum(ud)
-                    data['model']['acceleration'][ii] = np.sum(udd)
-                    data['model']['force'][ii] = np.sum(
-                        force * self.volume[:, np.newaxis])
-                    data['model']['body_force'][ii] = np.sum(
-                        body_force * self.volume[:, np.newaxis])
-
-                    damage_sum = np.sum(damage)
-                    data['model']['damage_sum'][ii] = damage_sum
-                    if damage_sum > 0.05*self.nnodes:
-                        warnings.warn('Over 5% of bonds have broken!\
-                                      peridynamics simulation continuing')
-                    elif damage_sum > 0.7*self.nnodes:
-                        warnings.warn('Over 7% of bonds have broken!\
-                                      peridynamics simulation continuing')
-        for tip_type_str in data:
-            # Average the nodal displacements, velocities and
-            # accelerations
-            ntip = self.ntips[tip_type_str]
-            if ntip != 0:
-                data[tip_type_str]['displacement'] /= ntip
-                data[tip_type_str]['velocity'] /= ntip
-                data[tip_type_str]['acceleration'] /= ntip
-        (u,
-         ud,
-         udd,
-         force,
-         body_force,
-         damage,
-         nlist,
-         n_neigh) = self.integrator.write(
-             u, ud, udd, force, body_force, damage, nlist, n_neigh)
+        # Mesh files are written by a single worker thread, while the
+        # following time-steps are simulated
+        executor = ThreadPoolExecutor(max_workers=1)
+        mesh_write = None
+        # The final state is copied into these arrays, the periodic writes
+        # return page-locked arrays owned by the integrator
+        state = (u, ud, udd, force, body_force, damage)
+
+        try:
+            for step in trange(first_step, first_step+steps,
+                               desc="Simulation Progress", unit="steps"):
+
+                # Call one integration step
+                self.integrator(
+                    displacement_bc_magnitudes[step - 1],
+                    force_bc_magnitudes[step - 1])
+
+                if write:
+                    if step % write == 0:
+                        # The connectivity is not used here, it is copied by
+                        # the final write
+                        (u,
+                         ud,
+                         udd,
+                         force,
+                         body_force,
+                         damage,
+                         nlist,
+                         n_neigh) = self.integrator.write(
+                             u, ud, udd, force, body_force, damage, nlist,
+                             n_neigh, connectivity=False, pinned=True)
+
+                        # The arrays are copied, as the integrator may update
+                        # them in place. At most one mesh file is written at a
+                        # time.
+                        if mesh_write is not None:
+                            mesh_write.result()
+                        mesh_write = executor.submit(
+                            self.write_mesh, write_path/f"U_{step}.vtk",
+                            damage.copy(), u.copy())
+
+                        # Write index number
+                        ii = step // write - (first_step - 1) // write - 1
+
+                        for tip_type, node_list in self.tip_types.items():
+                            if tip_type not in data:
+                                # Build data dict for this tip type
+                                data[tip_type] = {
+                                    'displacement': np.zeros(
+                                        nwrites, dtype=np.float64),
+                                    'velocity': np.zeros(
+                                        nwrites, dtype=np.float64),
+                                    'acceleration': np.zeros(
+                                        nwrites, dtype=np.float64),
+                                    'force': np.zeros(
+                                        nwrites, dtype=np.float64),
+                                    'body_force': np.zeros(
+                                        nwrites, dtype=np.float64)
+                                    }
+                            for node in node_list:
+                                i, j = node
+                                # Add to tip data for the write index, ii
+                                data[tip_type]['displacement'][ii] += (
+                                    u[i, j])
+                                data[tip_type]['velocity'][ii] += (
+                                    ud[i, j])
+                                data[tip_type]['acceleration'][ii] += (
+                                    udd[i, j])
+                                data[tip_type]['force'][ii] += (
+                                    force[i, j] * self.volume[i])
+                                data[tip_type]['body_force'][ii] += (
+                                    body_force[i, j] * self.volume[i])
+
+                        # Add to model data for the write index, ii
+                        data['model']['step'][ii] = step
+                        data['model']['displacement'][ii] = np.sum(u)
+                        data['model']['velocity'][ii] = np.sum(ud)
+                        data['model']['acceleration'][ii] = np.sum(udd)
+                        data['model']['force'][ii] = np.sum(
+                            force * self.volume[:, np.newaxis])
+                        data['model']['body_force'][ii] = np.sum(
+                            body_force * self.volume[:, np.newaxis])
+
+                        damage_sum = np.sum(damage)
+                        data['model']['damage_sum'][ii] = damage_sum
+                        if damage_sum > 0.05*self.nnodes:
+                            warnings.warn(
+                                'Over 5% of bonds have broken! '
+                                'peridynamics simulation continuing')
+                        elif damage_sum > 0.7*self.nnodes:
+                            warnings.warn(
+                                'Over 7% of bonds have broken! '
+                                'peridynamics simulation continuing')
+            if mesh_write is not None:
+                # Wait for the last mesh file, raising any exception from
+                # writing it
+                mesh_write.result()
+            for tip_type_str in data:
+                # Average the nodal displacements, velocities and
+                # accelerations
+                ntip = self.ntips[tip_type_str]
+                if ntip != 0:
+                    data[tip_type_str]['displacement'] /= ntip
+                    data[tip_type_str]['velocity'] /= ntip
+                    data[tip_type_str]['acceleration'] /= ntip
+            (u,
+             ud,
+             udd,
+             force,
+             body_force,
+             damage,
+             nlist,
+             n_neigh) = self.integrator.write(*state, nlist, n_neigh)
+        finally:
+            # Wait for any pending mesh write, also if the simulation failed
+            executor.shutdown()
+            self.integrator.release_host_arrays()
 
         return (u, damage, (nlist, n_neigh), force, ud, data)
 
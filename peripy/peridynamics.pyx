@@ -16,7 +16,7 @@ def damage(int[:] n_neigh, int[:] family):
         dtype=numpy.int32.
     :type family: :class:`numpy.ndarray`
     """
-    cdef nnodes = family.shape[0]
+    cdef int nnodes = family.shape[0]
 
     result = np.empty(nnodes, dtype=np.float64)
     cdef double[:] result_view = result
@@ -156,6 +156,115 @@ def break_bonds(double[:, :] r, double[:, :]r0, int[:, :] nlist,
         n_neigh[i] = i_n_neigh
 
 
+def bond_force_break_bonds(double[:, :] r, double[:, :] r0, int[:, :] nlist,
+                           int[:] n_neigh, double[:] volume,
+                           double bond_stiffness, double critical_strain,
+                           double[:, :] force_bc_values,
+                           int[:, :] force_bc_types, double force_bc_scale,
+                           double[:, :] force):
+    """
+    Break bonds which have exceeded the critical strain and calculate the
+    force due to the remaining bonds on each node.
+
+    This is equivalent to calling :func:`break_bonds` followed by
+    :func:`bond_force`, but the neighbour list is traversed and the strain of
+    each bond is calculated only once. The force is written into `force` so
+    that no array is allocated per call.
+
+    :arg r: The current coordinates of each node.
+    :type r: :class:`numpy.ndarray`
+    :arg r0: The initial coordinates of each node.
+    :type r0: :class:`numpy.ndarray`
+    :arg nlist: The neighbour list
+    :type nlist: :class:`numpy.ndarray`
+    :arg n_neigh: The number of neighbours for each node.
+    :type n_neigh: :class:`numpy.ndarray`
+    :arg volume: The volume of each node.
+    :type volume: :class:`numpy.ndarray`
+    :arg float bond_stiffness: The bond stiffness.
+    :arg float critical_strain: The critical strain.
+    :arg force_bc_values: The force boundary condition values for each node.
+    :type force_bc_values: :class:`numpy.ndarray`
+    :arg force_bc_types: The force boundary condition types for each node.
+    :type force_bc_types: :class:`numpy.ndarray`
+    :arg double bc_scale: The scalar value applied to the
+        force boundary conditions.
+    :arg force: An (n,3) array which is overwritten with the force due to
+        bonds on each node.
+    :type force: :class:`numpy.ndarray`
+    """
+    cdef int nnodes = nlist.shape[0]
+
+    force[:, :] = 0.0
+    cdef double[:, :] force_view = force
+
+    cdef int i, j, dim, i_n_neigh, neigh
+    cdef int j_n_neigh, jneigh
+    cdef double strain, l, force_norm
+    cdef double[3] f
+
+    for i in range(nnodes):
+        # Get current number of neighbours
+        i_n_neigh = n_neigh[i]
+
+        neigh = 0
+        while neigh < i_n_neigh:
+            j = nlist[i, neigh]
+
+            if i < j:
+                l = ceuclid(r[i], r[j])
+                strain = cstrain2(l, r0[i], r0[j])
+
+                if abs(strain) < critical_strain:
+                    # Calculate total force
+                    force_norm = strain * bond_stiffness
+
+                    # Calculate component of force in each dimension
+                    force_norm = force_norm / l
+                    for dim in range(3):
+                        f[dim] = force_norm * (r[j, dim] - r[i, dim])
+
+                    # Add force to particle i, using Newton's third law
+                    # subtract force from j
+                    # Scale the force by the partial volume of the child
+                    # particle
+                    for dim in range(3):
+                        force_view[i, dim] = (force_view[i, dim]
+                                              + f[dim] * volume[j])
+                        force_view[j, dim] = (force_view[j, dim]
+                                              - f[dim] * volume[i])
+
+                    # Move onto the next neighbour
+                    neigh += 1
+                else:
+                    # Remove this neighbour by replacing it with the last
+                    # neighbour on the list, then reducing the number of
+                    # neighbours by 1.
+                    # As neighbour `neigh` is now a new neighbour, we do not
+                    # advance the neighbour index
+                    nlist[i, neigh] = nlist[i, i_n_neigh-1]
+                    i_n_neigh -= 1
+
+                    # Remove from j
+                    j_n_neigh = n_neigh[j]
+                    for jneigh in range(j_n_neigh):
+                        if nlist[j, jneigh] == i:
+                            nlist[j, jneigh] = nlist[j, j_n_neigh-1]
+                            n_neigh[j] = n_neigh[j] - 1
+                            break
+            else:
+                # Move onto the next neighbour
+                neigh += 1
+
+        n_neigh[i] = i_n_neigh
+
+        # Apply boundary conditions
+        for dim in range(3):
+            if force_bc_types[i, dim] != 0:
+                force_view[i, dim] = force_view[i, dim] + (
+                    force_bc_scale * force_bc_values[i, dim])
+
+
 def update_displacement(double[:, :] u, double[:, :] bc_values, 
                         int[:, :] bc_types, double[:, :] force, 
                         double bc_scale, double dt):
@@ -177,6 +286,9 @@ def update_displacement(double[:, :] u, double[:, :] bc_values,
     :arg float dt: The length of the timestep in seconds.
     """
     cdef int nnodes = u.shape[0]
+
+    cdef int i, dim
+
     for i in range(nnodes):
             for dim in range(3):
                 if bc_types[i, dim] == 0:
@@ -89,6 +89,11 @@ class TestBondForce:
         r0_d = cl.Buffer(
             context, mf.READ_ONLY | mf.COPY_HOST_PTR,
             hostbuf=r0)
+        bond_lengths = np.linalg.norm(
+            r0[nlist] - r0[:, np.newaxis, :], axis=-1)
+        bond_lengths_d = cl.Buffer(
+            context, mf.READ_ONLY | mf.COPY_HOST_PTR,
+            hostbuf=bond_lengths)
         vols_d = cl.Buffer(
             context, mf.READ_ONLY | mf.COPY_HOST_PTR,
             hostbuf=volume)
@@ -121,10 +126,10 @@ class TestBondForce:
         bond_force = program.bond_force1
         bond_force(
             queue, (nnodes * max_neigh,),
-            (max_neigh,), u_d, force_d, body_force_d, r0_d, vols_d, nlist_d,
-            force_bc_types_d, force_bc_values_d, stiffness_corrections_d,
-            bond_types_d, regimes_d, plus_cs_d, local_mem_x,
-            local_mem_y, local_mem_z, np.float64(bond_stiffness),
+            (max_neigh,), u_d, force_d, body_force_d, r0_d, bond_lengths_d,
+            vols_d, nlist_d, force_bc_types_d, force_bc_values_d,
+            stiffness_corrections_d, bond_types_d, regimes_d, plus_cs_d,
+            local_mem_x, local_mem_y, local_mem_z, np.float64(bond_stiffness),
             np.float64(critical_stretch), np.float64(force_bc_scale),
             np.intc(nregimes))
 
@@ -190,6 +195,11 @@ class TestBondForce:
         r0_d = cl.Buffer(
             context, mf.READ_ONLY | mf.COPY_HOST_PTR,
             hostbuf=r0)
+        bond_lengths = np.linalg.norm(
+            r0[nlist] - r0[:, np.newaxis, :], axis=-1)
+        bond_lengths_d = cl.Buffer(
+            context, mf.READ_ONLY | mf.COPY_HOST_PTR,
+            hostbuf=bond_lengths)
         vols_d = cl.Buffer(
             context, mf.READ_ONLY | mf.COPY_HOST_PTR,
             hostbuf=volume)
@@ -222,10 +232,10 @@ class TestBondForce:
         bond_force = program.bond_force1
         bond_force(
             queue, (nnodes * max_neigh,),
-            (max_neigh,), u_d, force_d, body_force_d, r0_d, vols_d, nlist_d,
-            force_bc_types_d, force_bc_values_d, stiffness_corrections_d,
-            bond_types_d, regimes_d, plus_cs_d, local_mem_x,
-            local_mem_y, local_mem_z, np.float64(bond_stiffness),
+            (max_neigh,), u_d, force_d, body_force_d, r0_d, bond_lengths_d,
+            vols_d, nlist_d, force_bc_types_d, force_bc_values_d,
+            stiffness_corrections_d, bond_types_d, regimes_d, plus_cs_d,
+            local_mem_x, local_mem_y, local_mem_z, np.float64(bond_stiffness),
             np.float64(critical_stretch), np.float64(force_bc_scale),
             np.intc(nregimes))
 
@@ -301,13 +311,18 @@ class TestBondForce:
         local_mem_z = cl.LocalMemory(
             np.dtype(np.float64).itemsize * max_neigh)
         local_mem = cl.LocalMemory(
-            np.dtype(np.float64).itemsize * max_neigh)
+            np.dtype(np.intc).itemsize * max_neigh)
         # Read only
         u_d = cl.Buffer(context, mf.READ_ONLY | mf.COPY_HOST_PTR,
                         hostbuf=u)
         r0_d = cl.Buffer(
             context, mf.READ_ONLY | mf.COPY_HOST_PTR,
             hostbuf=r0)
+        bond_lengths = np.linalg.norm(
+            r0[nlist] - r0[:, np.newaxis, :], axis=-1)
+        bond_lengths_d = cl.Buffer(
+            context, mf.READ_ONLY | mf.COPY_HOST_PTR,
+            hostbuf=bond_lengths)
         vols_d = cl.Buffer(
             context, mf.READ_ONLY | mf.COPY_HOST_PTR,
             hostbuf=volume)
@@ -345,10 +360,10 @@ class TestBondForce:
         damage_kernel = program.damage
         bond_force(
             queue, (nnodes * max_neigh,),
-            (max_neigh,), u_d, force_d, body_force_d, r0_d, vols_d, nlist_d,
-            force_bc_types_d, force_bc_values_d, stiffness_corrections_d,
-            bond_types_d, regimes_d, plus_cs_d, local_mem_x,
-            local_mem_y, local_mem_z, np.float64(bond_stiffness),
+            (max_neigh,), u_d, force_d, body_force_d, r0_d, bond_lengths_d,
+            vols_d, nlist_d, force_bc_types_d, force_bc_values_d,
+            stiffness_corrections_d, bond_types_d, regimes_d, plus_cs_d,
+            local_mem_x, local_mem_y, local_mem_z, np.float64(bond_stiffness),
             np.float64(critical_stretch), np.float64(force_bc_scale),
             np.intc(nregimes))
         damage_kernel(
@@ -438,6 +453,11 @@ class TestBondForce2:
         r0_d = cl.Buffer(
             context, mf.READ_ONLY | mf.COPY_HOST_PTR,
             hostbuf=r0)
+        bond_lengths = np.linalg.norm(
+            r0[nlist] - r0[:, np.newaxis, :], axis=-1)
+        bond_lengths_d = cl.Buffer(
+            context, mf.READ_ONLY | mf.COPY_HOST_PTR,
+            hostbuf=bond_lengths)
         vols_d = cl.Buffer(
             context, mf.READ_ONLY | mf.COPY_HOST_PTR,
             hostbuf=volume)
@@ -469,10 +489,10 @@ class TestBondForce2:
         bond_force = program.bond_force2
         bond_force(
             queue, (nnodes * max_neigh,),
-            (max_neigh,), u_d, force_d, body_force_d, r0_d, vols_d, nlist_d,
-            force_bc_types_d, force_bc_values_d, stiffness_corrections_d,
-            bond_types_d, regimes_d, plus_cs_d, local_mem_x,
-            local_mem_y, local_mem_z, np.float64(bond_stiffness),
+            (max_neigh,), u_d, force_d, body_force_d, r0_d, bond_lengths_d,
+            vols_d, nlist_d, force_bc_types_d, force_bc_values_d,
+            stiffness_corrections_d, bond_types_d, regimes_d, plus_cs_d,
+            local_mem_x, local_mem_y, local_mem_z, np.float64(bond_stiffness),
             np.float64(critical_stretch), np.float64(force_bc_scale),
             np.intc(nregimes))
 
@@ -542,6 +562,11 @@ class TestBondForce2:
         r0_d = cl.Buffer(
             context, mf.READ_ONLY | mf.COPY_HOST_PTR,
             hostbuf=r0)
+        bond_lengths = np.linalg.norm(
+            r0[nlist] - r0[:, np.newaxis, :], axis=-1)
+        bond_lengths_d = cl.Buffer(
+            context, mf.READ_ONLY | mf.COPY_HOST_PTR,
+            hostbuf=bond_lengths)
         vols_d = cl.Buffer(
             context, mf.READ_ONLY | mf.COPY_HOST_PTR,
             hostbuf=volume)
@@ -573,10 +598,10 @@ class TestBondForce2:
         bond_force = program.bond_force2
         bond_force(
             queue, (nnodes * max_neigh,),
-            (max_neigh,), u_d, force_d, body_force_d, r0_d, vols_d, nlist_d,
-            force_bc_types_d, force_bc_values_d, stiffness_corrections_d,
-            bond_types_d, regimes_d, plus_cs_d, local_mem_x,
-            local_mem_y, local_mem_z, np.float64(bond_stiffness),
+            (max_neigh,), u_d, force_d, body_force_d, r0_d, bond_lengths_d,
+            vols_d, nlist_d, force_bc_types_d, force_bc_values_d,
+            stiffness_corrections_d, bond_types_d, regimes_d, plus_cs_d,
+            local_mem_x, local_mem_y, local_mem_z, np.float64(bond_stiffness),
             np.float64(critical_stretch), np.float64(force_bc_scale),
             np.intc(nregimes))
 
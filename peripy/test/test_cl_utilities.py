@@ -1,6 +1,8 @@
 """Tests for the cl/utilities module."""
-from ..cl import get_context
+from .conftest import context_available
+from ..cl import get_context, pinned_empty, pinned_release
 from ..cl.utilities import DOUBLE_FP_SUPPORT, output_device_info
+import numpy as np
 import pyopencl as cl
 
 
@@ -16,3 +18,26 @@ def test_get_context():
         assert (output_device_info(devices[0]) == 1)
     else:
         assert context is None
+
+
+@context_available
+def test_pinned_empty():
+    """Test the pinned_empty function."""
+    context = get_context()
+    queue = cl.CommandQueue(context)
+    expected = np.arange(12, dtype=np.float64).reshape((4, 3))
+
+    array = pinned_empty(context, queue, expected.shape, expected.dtype)
+    assert array.shape == expected.shape
+    assert array.dtype == expected.dtype
+
+    # Round trip through device memory
+    array[:] = expected
+    buffer = cl.Buffer(context, cl.mem_flags.READ_WRITE, expected.nbytes)
+    cl.enqueue_copy(queue, buffer, array)
+    array[:] = 0.0
+    cl.enqueue_copy(queue, array, buffer)
+    assert np.all(array == expected)
+
+    pinned_release(queue, array)
+    queue.finish()
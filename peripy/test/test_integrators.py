@@ -69,6 +69,22 @@ def euler_cl_integrator(data_path, simple_displacement_boundary):
     return model, euler
 
 
+@pytest.fixture(scope="module")
+def euler_cl_float32_integrator(data_path, simple_displacement_boundary):
+    """Run the example simulation on a single precision EulerCL integrator."""
+    path = data_path
+    mesh_file = path / "example_mesh.vtk"
+    euler = EulerCL(dt=1e-3, dtype=np.float32)
+    # Create model
+    model = Model(mesh_file, integrator=euler, horizon=0.1,
+                  critical_stretch=0.005,
+                  bond_stiffness=18.0 * 0.05 / (np.pi * 0.1**4),
+                  is_displacement_boundary=simple_displacement_boundary,
+                  initial_crack=is_crack)
+
+    return model, euler
+
+
 @pytest.fixture(scope="module")
 def euler_cromer_cl_integrator(data_path, simple_displacement_boundary):
     """Run the example simulation on the EulerCromerCL integrator."""
@@ -135,6 +151,14 @@ def test_invalid_custom_context():
         assert "context must be a pyopencl Context object" in exception.value
 
 
+def test_invalid_dtype():
+    """Test constructing an EulerCL object with an unsupported dtype."""
+    with pytest.raises(ValueError) as exception:
+        EulerCL(dt=1, dtype=np.int32)
+
+    assert "dtype must be numpy.float64 or" in str(exception.value)
+
+
 class TestIntegrator:
     """ABC class tests."""
 
@@ -454,6 +478,92 @@ class TestEulerCL:
         assert np.allclose(nlist_actual, nlist_expected)
         assert np.allclose(n_neigh_actual, n_neigh_expected)
 
+    @context_available
+    def test_call_float32(self, data_path, euler_cl_float32_integrator):
+        """Test the EulerCL integrator in single precision."""
+        path = data_path
+        model, integrator = euler_cl_float32_integrator
+        nlist, n_neigh = model.initial_connectivity
+        u = np.zeros((model.nnodes, 3), dtype=np.float64)
+        ud = np.zeros((model.nnodes, 3), dtype=np.float64)
+        udd = np.zeros((model.nnodes, 3), dtype=np.float64)
+        force = np.zeros((model.nnodes, 3), dtype=np.float64)
+        body_force = np.zeros((model.nnodes, 3), dtype=np.float64)
+        damage = np.zeros((model.nnodes), dtype=np.float64)
+        regimes = None
+
+        integrator.create_buffers(
+            nlist, n_neigh, model.bond_stiffness, model.critical_stretch,
+            model.plus_cs, u, ud, udd, force, body_force, damage, regimes,
+            model.nregimes, model.nbond_types)
+        displacement_bc_magnitudes = 0.00001 / 2 * np.linspace(
+            1, 10, 10)
+        for step in range(10):
+            integrator.__call__(
+                displacement_bc_magnitude=displacement_bc_magnitudes[step],
+                force_bc_magnitude=0.0)
+
+        u_expected = np.load(path/"expected_displacements.npy")
+        force_expected = np.load(path/"expected_force.npy")
+        damage_expected = np.load(path/"expected_damage.npy")
+
+        (u_actual,
+         _,
+         _,
+         force_actual,
+         _,
+         damage_actual,
+         _,
+         _
+         ) = integrator.write(
+             u, ud, udd, force, body_force, damage, nlist, n_neigh)
+
+        assert np.allclose(u_actual, u_expected)
+        assert np.allclose(
+            force_actual, force_expected, rtol=1e-3,
+            atol=1e-3 * np.max(np.abs(force_expected)))
+        assert np.allclose(damage_actual, damage_expected)
+
+    @context_available
+    def test_write_without_connectivity(self, euler_cl_integrator):
+        """Test that the connectivity is not copied if it is not needed."""
+        model, integrator = euler_cl_integrator
+        nlist, n_neigh = model.initial_connectivity
+        u = np.zeros((model.nnodes, 3), dtype=np.float64)
+        ud = np.zeros((model.nnodes, 3), dtype=np.float64)
+        udd = np.zeros((model.nnodes, 3), dtype=np.float64)
+        force = np.zeros((model.nnodes, 3), dtype=np.float64)
+        body_force = np.zeros((model.nnodes, 3), dtype=np.float64)
+        damage = np.zeros((model.nnodes), dtype=np.float64)
+        regimes = None
+
+        integrator.create_buffers(
+            nlist, n_neigh, model.bond_stiffness, model.critical_stretch,
+            model.plus_cs, u, ud, udd, force, body_force, damage, regimes,
+            model.nregimes, model.nbond_types)
+
+        *_, nlist_actual, n_neigh_actual = integrator.write(
+            u, ud, udd, force, body_force, damage, nlist, n_neigh,
+            connectivity=False)
+
+        assert nlist_actual is nlist
+        assert n_neigh_actual is n_neigh
+
+    @context_available
+    def test_bond_lengths_float32(self, euler_cl_float32_integrator):
+        """Test the initial bond lengths are stored in single precision."""
+        model, integrator = euler_cl_float32_integrator
+        nlist, _ = model.initial_connectivity
+
+        bond_lengths = integrator._bond_lengths(nlist)
+
+        assert bond_lengths.dtype == np.float32
+        i, k = np.nonzero(nlist != -1)
+        assert np.allclose(
+            bond_lengths[i, k],
+            np.linalg.norm(model.coords[nlist[i, k]] - model.coords[i],
+                           axis=1), rtol=1e-6)
+
     @context_available
     def test_create_buffers_float(self, euler_cl_integrator):
         """Test initiation of arrays that are dependent on simulation."""
@@ -535,6 +645,33 @@ class TestEulerCL:
             assert (
                 str("densities are not supported") in exception.value)
 
+    @context_available
+    def test_bond_lengths(self, euler_cl_integrator):
+        """Test the calculation of the initial bond lengths."""
+        model, integrator = euler_cl_integrator
+        nlist, _ = model.initial_connectivity
+
+        bond_lengths = integrator._bond_lengths(nlist)
+
+        assert bond_lengths.shape == nlist.shape
+        assert bond_lengths.dtype == np.float64
+        assert np.all(bond_lengths[nlist == -1] == 0.0)
+        i, k = np.nonzero(nlist != -1)
+        assert np.allclose(
+            bond_lengths[i, k],
+            np.linalg.norm(model.coords[nlist[i, k]] - model.coords[i],
+                           axis=1))
+
+    @context_available
+    def test_work_sizes(self, euler_cl_integrator):
+        """Test the choice of work sizes for the displacement update."""
+        model, integrator = euler_cl_integrator
+        (global_size,), (local_size,) = integrator.update_displacement_sizes
+
+        assert global_size % local_size == 0
+        assert 0 <= global_size - model.degrees_freedom * model.nnodes \
+            < local_size
+
     @context_available
     def test_create_special_buffers(self, euler_cl_integrator):
         """There are no special buffers so this method does nothing."""
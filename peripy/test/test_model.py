@@ -8,6 +8,7 @@ from ..integrators import Euler, EulerCL, EulerCromerCL
 import meshio
 import numpy as np
 import pytest
+import time
 
 
 @pytest.fixture(
@@ -387,7 +388,7 @@ def test_initial_damage_2d_cl(basic_model_2d_cl):
     queue = integrator.queue
     nlist, n_neigh = model.initial_connectivity
     local_mem = cl.LocalMemory(
-        np.dtype(np.float64).itemsize * model.max_neighbours)
+        np.dtype(np.intc).itemsize * model.max_neighbours)
     family_d = cl.Buffer(
         context, mf.READ_ONLY | mf.COPY_HOST_PTR,
         hostbuf=model.family)
@@ -412,7 +413,7 @@ def test_initial_damage_3d_cl(basic_model_3d_cl):
     queue = integrator.queue
     nlist, n_neigh = model.initial_connectivity
     local_mem = cl.LocalMemory(
-        np.dtype(np.float64).itemsize * model.max_neighbours)
+        np.dtype(np.intc).itemsize * model.max_neighbours)
     family_d = cl.Buffer(
         context, mf.READ_ONLY | mf.COPY_HOST_PTR,
         hostbuf=model.family)
@@ -1687,6 +1688,59 @@ class TestSimulate:
 
         assert mesh.read_bytes() == expected_mesh.read_bytes()
 
+    @pytest.mark.parametrize(
+        "model_fixture",
+        ["cython_model", pytest.param("cl_model", marks=context_available)])
+    def test_write_multiple(
+            self, model_fixture, request, tmp_path, monkeypatch):
+        """Ensure that each mesh file written by simulate is of its step."""
+        model = request.getfixturevalue(model_fixture)
+        steps = 4
+        displacement_bc_magnitudes = 1.0e-3 * np.linspace(1, steps, steps)
+
+        # Delay the mesh writes, so that they overlap with the following
+        # time-steps
+        write_mesh = model.write_mesh
+
+        def slow_write_mesh(*args, **kwargs):
+            time.sleep(0.05)
+            write_mesh(*args, **kwargs)
+        monkeypatch.setattr(model, "write_mesh", slow_write_mesh)
+
+        model.simulate(
+            steps=steps,
+            displacement_bc_magnitudes=displacement_bc_magnitudes,
+            write=1,
+            write_path=tmp_path
+            )
+
+        for step in range(1, steps + 1):
+            u, damage, *_ = model.simulate(
+                steps=step,
+                displacement_bc_magnitudes=displacement_bc_magnitudes
+                )
+            mesh = meshio.read(tmp_path / f"U_{step}.vtk")
+            assert np.allclose(mesh.point_data["displacements"], u)
+            assert np.allclose(mesh.point_data["damage"], damage)
+
+    @context_available
+    def test_results_owned(self, cl_model, tmp_path):
+        """Ensure the arrays returned by simulate are owned by the caller."""
+        model = cl_model
+
+        # The periodic writes use the page-locked host arrays
+        u, damage, (nlist, n_neigh), force, ud, _ = model.simulate(
+            steps=2,
+            displacement_bc_magnitudes=np.array([0, 0]),
+            write=1,
+            write_path=tmp_path
+            )
+
+        for array in [u, damage, nlist, n_neigh, force, ud]:
+            assert array.base is None
+        # The page-locked host arrays have been released
+        assert model.integrator.u_h is None
+
 
 class TestSimulateInitialise:
     """Tests for the _simulate_initialise function."""
@@ -1,7 +1,7 @@
 """Tests for the peridynamics modules."""
 import numpy as np
 from peripy.peridynamics import (damage, bond_force, break_bonds,
-                                 update_displacement)
+                                 bond_force_break_bonds, update_displacement)
 
 
 def test_damage():
@@ -133,6 +133,58 @@ class TestForce:
         assert np.allclose(actual_force, expected_force)
 
 
+def test_bond_force_break_bonds():
+    """Test fused bond breaking and force calculation."""
+    r0 = np.array([
+        [0.0, 0.0, 0.0],
+        [1.0, 0.0, 0.0],
+        [0.0, 1.0, 0.0],
+        [2.0, 0.0, 0.0],
+        [0.0, 0.0, 1.0],
+        ])
+    nl = np.array([
+        [1, 2, 4],
+        [0, 3, 0],
+        [0, 0, 0],
+        [1, 0, 0],
+        [0, 0, 0]
+        ], dtype=np.intc)
+    n_neigh = np.array([3, 2, 1, 1, 1], dtype=np.intc)
+    nnodes = 5
+    r = np.array([
+        [0.0, 0.0, 0.0],
+        [1.5, 0.0, 0.0],
+        [0.0, 1.1, 0.0],
+        [3.5, 0.0, 0.0],
+        [0.0, 0.0, 2.5],
+        ])
+    volume = np.full(nnodes, 0.5)
+    bond_stiffness = 2.0
+    critical_strain = 1.0
+    force_bc_scale = 0.5
+    force_bc_types = np.zeros((nnodes, 3), dtype=np.int32)
+    force_bc_types[3, 0] = 1
+    force_bc_values = np.zeros((nnodes, 3), dtype=np.float64)
+    force_bc_values[3, 0] = 2.0
+
+    nl_expected = nl.copy()
+    n_neigh_expected = n_neigh.copy()
+    break_bonds(r, r0, nl_expected, n_neigh_expected, critical_strain)
+    force_expected = bond_force(
+        r, r0, nl_expected, n_neigh_expected, volume, bond_stiffness,
+        force_bc_values, force_bc_types, force_bc_scale)
+
+    # Stale values must be overwritten
+    force_actual = np.ones((nnodes, 3))
+    bond_force_break_bonds(
+        r, r0, nl, n_neigh, volume, bond_stiffness, critical_strain,
+        force_bc_values, force_bc_types, force_bc_scale, force_actual)
+
+    assert np.all(nl == nl_expected)
+    assert np.all(n_neigh == n_neigh_expected)
+    assert np.allclose(force_actual, force_expected)
+
+
 class TestUpdateDisplacement:
     """Test the displacement update."""
 